@@ -4,7 +4,7 @@ based on the output of various Restic commands.
 
 It defines templates for Prometheus metrics and functions to format the metrics
 based on the parsed Restic output. The metrics include information about backup,
-forget, prune, check, and stats operations.
+forget, prune, check, and stats operations, and the retries of the restic commands.
 """
 
 from collections.abc import Iterator
@@ -208,6 +208,19 @@ restic_stats_duration_seconds{{config="{name}",repository="{repository}"}} {dura
 restic_stats_rc{{config="{name}",repository="{repository}"}} {rc}
 """
 
+_restic_help_retries = """
+# HELP restic_retry_tries Number of tries of the restic command
+# TYPE restic_retry_tries gauge
+# HELP restic_retry_sleep_seconds Time waited between the tries of the restic command in seconds
+# TYPE restic_retry_sleep_seconds gauge
+# HELP restic_retry_failure_class Class of the last failure of the restic command
+# TYPE restic_retry_failure_class gauge
+"""
+_restic_retries = """
+restic_retry_tries{{config="{name}",action="{action}",repository="{repository}"}} {tries}
+restic_retry_sleep_seconds{{config="{name}",action="{action}",repository="{repository}"}} {sleep_seconds}
+"""
+
 
 def generate_lines(metrics: dict[str, Any], name: str) -> Iterator[str]:
     """
@@ -233,6 +246,8 @@ def generate_lines(metrics: dict[str, Any], name: str) -> Iterator[str]:
         yield check_metrics(metrics["check"], name)
     if metrics.get("stats"):
         yield stats_metrics(metrics["stats"], name)
+    if metrics.get("retries"):
+        yield retry_metrics(metrics["retries"], name)
 
 
 def backup_metrics(metrics: dict[str, Any], name: str) -> str:
@@ -356,3 +371,28 @@ def stats_metrics(metrics: dict[str, Any], name: str) -> str:
         else:
             retval += _restic_stats.format(name=name, repository=repo, **mtrx)
     return retval
+
+
+def retry_metrics(metrics: dict[str, Any], name: str) -> str:
+    """
+    Generate Prometheus metrics for the retries of Restic commands.
+
+    Args:
+        metrics (dict[str, Any]): A dictionary containing retry metrics per action and repository.
+        name (str): The configuration name for the metrics.
+
+    Returns:
+        str: Prometheus-formatted retry metrics.
+    """
+    retval = _restic_help_retries
+    for action, repos in metrics.items():
+        for repo, mtrx in repos.items():
+            retval += _restic_retries.format(
+                name=name, action=action, repository=repo, **mtrx
+            )
+            if mtrx["failure_class"]:
+                retval += (
+                    f'restic_retry_failure_class{{config="{name}",action="{action}",'
+                    f'repository="{repo}",class="{mtrx["failure_class"]}"}} 1\n'
+                )
+    return retval
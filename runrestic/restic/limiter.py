@@ -0,0 +1,242 @@
+"""
+This module provides the `ConcurrencyLimiter`, which bounds how many commands run at the same time.
+
+A single limiter is shared by all actions of a `ResticRunner`. Slots are granted in the order in
+which they were requested, so a serial run still executes the repositories in config order. Slots
+can belong to a group (e.g. the backend host of a repository) with its own limit; a request whose
+group is saturated does not hold up requests for other groups. The limiter is thread-safe and can
+be awaited from an asyncio event loop as well.
+"""
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+
+def concurrency_limit(config: dict[str, Any]) -> int | None:
+    """
+    Derive the concurrency limit from an execution configuration.
+
+    `max_concurrency` takes precedence. Without it, `parallel = true` means no limit and
+    `parallel = false` means one command at a time.
+
+    Args:
+        config (dict[str, Any]): Configuration dictionary for command execution.
+
+    Returns:
+        int | None: The maximum number of concurrent commands, or None for no limit.
+    """
+    if config.get("max_concurrency"):
+        return int(config["max_concurrency"])
+    return None if config.get("parallel") else 1
+
+
+class Slot:
+    """
+    A queued request for one unit of concurrency.
+
+    Attributes:
+        limit (int | None): Concurrency limit requested for this slot, on top of the limiter's own.
+        group (str | None): Group the slot counts towards, None for no group.
+        granted (bool): Whether the slot has been granted and is currently held.
+    """
+
+    def __init__(
+        self, limiter: "ConcurrencyLimiter", limit: int | None, group: str | None
+    ) -> None:
+        """
+        Initialize the slot. Use `ConcurrencyLimiter.request` instead of creating slots directly.
+
+        Args:
+            limiter (ConcurrencyLimiter): The limiter this slot belongs to.
+            limit (int | None): Concurrency limit requested for this slot.
+            group (str | None): Group the slot counts towards.
+        """
+        self.limiter = limiter
+        self.limit = limit
+        self.group = group
+        self.granted = False
+        self._event = threading.Event()
+        self._futures: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+
+    def _grant(self) -> None:
+        """Mark the slot as granted and wake up everybody waiting for it. Called with the lock held."""
+        self.granted = True
+        self._event.set()
+        for loop, future in self._futures:
+            loop.call_soon_threadsafe(_set_future_result, future)
+        self._futures.clear()
+
+    def wait(self) -> None:
+        """Block the calling thread until the slot is granted."""
+        self._event.wait()
+
+    async def wait_async(self) -> None:
+        """Wait on the running event loop until the slot is granted."""
+        loop = asyncio.get_running_loop()
+        with self.limiter.lock:
+            if self.granted:
+                return
+            future: asyncio.Future[None] = loop.create_future()
+            self._futures.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """Give the slot back, or withdraw the request if it has not been granted yet."""
+        self.limiter.release(self)
+
+
+def _set_future_result(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """
+    A FIFO limiter for the number of concurrently running commands.
+
+    Attributes:
+        max_concurrency (int | None): Upper bound for all slots of this limiter, None for no bound.
+        group_limits (dict[str, int]): Upper bound per group. The key "default" applies to all
+            groups without their own entry.
+        active (int): Number of slots currently held.
+        active_groups (dict[str, int]): Number of slots currently held per group.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        group_limits: dict[str, int] | None = None,
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency (int | None): Upper bound for all slots of this limiter, None for no bound.
+            group_limits (dict[str, int] | None): Upper bound per group, e.g. {"sftp:backup01": 2}.
+        """
+        self.max_concurrency = max_concurrency
+        self.group_limits = group_limits or {}
+        self.active = 0
+        self.active_groups: dict[str, int] = {}
+        self.lock = threading.Lock()
+        self._queue: list[Slot] = []
+
+    def request(self, limit: int | None = None, group: str | None = None) -> Slot:
+        """
+        Queue a request for a slot without waiting for it.
+
+        Args:
+            limit (int | None): Additional concurrency limit for this request, e.g. per action.
+            group (str | None): Group the slot counts towards, e.g. the backend of a repository.
+
+        Returns:
+            Slot: The queued slot. Wait on it before running the command and release it afterwards.
+        """
+        slot = Slot(self, limit, group)
+        with self.lock:
+            self._queue.append(slot)
+            self._dispatch()
+        return slot
+
+    def release(self, slot: Slot) -> None:
+        """
+        Release a held slot or withdraw a queued one. Releasing twice is a no-op.
+
+        Args:
+            slot (Slot): The slot to release.
+        """
+        with self.lock:
+            if slot.granted:
+                slot.granted = False
+                self.active -= 1
+                if slot.group is not None:
+                    self.active_groups[slot.group] -= 1
+            elif slot in self._queue:
+                self._queue.remove(slot)
+            self._dispatch()
+
+    @contextmanager
+    def slot(
+        self, limit: int | None = None, group: str | None = None
+    ) -> Iterator[Slot]:
+        """
+        Hold a slot for the duration of the `with` block, blocking until it is granted.
+
+        Args:
+            limit (int | None): Additional concurrency limit for this request.
+            group (str | None): Group the slot counts towards.
+
+        Yields:
+            Slot: The granted slot.
+        """
+        slot = self.request(limit, group)
+        try:
+            slot.wait()
+            yield slot
+        finally:
+            slot.release()
+
+    @asynccontextmanager
+    async def async_slot(
+        self, limit: int | None = None, group: str | None = None
+    ) -> AsyncIterator[Slot]:
+        """
+        Hold a slot for the duration of the `async with` block.
+
+        Args:
+            limit (int | None): Additional concurrency limit for this request.
+            group (str | None): Group the slot counts towards.
+
+        Yields:
+            Slot: The granted slot.
+        """
+        slot = self.request(limit, group)
+        try:
+            await slot.wait_async()
+            yield slot
+        finally:
+            slot.release()
+
+    def group_limit(self, group: str | None) -> int | None:
+        """
+        Look up the limit of a group.
+
+        Args:
+            group (str | None): Name of the group.
+
+        Returns:
+            int | None: The limit of the group, None if it is unbounded.
+        """
+        if group is None:
+            return None
+        return self.group_limits.get(group, self.group_limits.get("default"))
+
+    def _can_grant(self, slot: Slot) -> bool:
+        limits = [x for x in (self.max_concurrency, slot.limit) if x is not None]
+        if limits and self.active >= min(limits):
+            return False
+        if slot.group is None:
+            return True
+        group_limit = self.group_limit(slot.group)
+        return (
+            group_limit is None or self.active_groups.get(slot.group, 0) < group_limit
+        )
+
+    def _dispatch(self) -> None:
+        """Grant queued slots in request order as far as the limits allow. Called with the lock held."""
+        for slot in list(self._queue):
+            if self._can_grant(slot):
+                self._queue.remove(slot)
+                self.active += 1
+                if slot.group is not None:
+                    self.active_groups[slot.group] = (
+                        self.active_groups.get(slot.group, 0) + 1
+                    )
+                slot._grant()
@@ -0,0 +1,104 @@
+"""
+This module provides `OutputCapture`, a size-bounded store for the output of a process.
+
+Verbose restic runs print one line per file, so their complete output can grow to hundreds of
+megabytes. `OutputCapture` keeps the most recent output up to a size limit and, from the older
+output, only the summary lines the parsers in `output_parsing` need. Appending is linear in the
+size of the output, and memory use stays bounded no matter how much the process prints.
+"""
+
+import re
+from collections import deque
+
+from runrestic.restic.output_parsing import SUMMARY_PATTERN
+
+# Default limit for the captured output of one try, see `[execution] max_output_bytes`
+MAX_OUTPUT_BYTES = 1 << 20
+
+
+class OutputCapture:
+    """
+    Capture process output in a bounded ring of lines.
+
+    Three quarters of the limit are used for the tail of the output. Summary lines that drop
+    out of the tail are retained in the remaining quarter, oldest first out. Sizes are measured
+    in characters of the decoded output.
+
+    Attributes:
+        max_bytes (int | None): Size limit for the captured output, None for no limit.
+        truncated_bytes (int): Size of the output that has been dropped so far.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int | None = MAX_OUTPUT_BYTES,
+        summary_pattern: re.Pattern[str] = SUMMARY_PATTERN,
+    ) -> None:
+        """
+        Initialize the capture.
+
+        Args:
+            max_bytes (int | None): Size limit for the captured output, None for no limit.
+            summary_pattern (re.Pattern[str]): Lines matching this pattern are retained even if
+                they drop out of the tail.
+        """
+        self.max_bytes = max_bytes
+        self.summary_pattern = summary_pattern
+        self.truncated_bytes = 0
+        self._tail: deque[str] = deque()
+        self._tail_bytes = 0
+        self._summary: deque[str] = deque()
+        self._summary_bytes = 0
+        self._summary_limit = max_bytes // 4 if max_bytes is not None else 0
+        self._tail_limit = (
+            max_bytes - self._summary_limit if max_bytes is not None else None
+        )
+
+    def append(self, line: str) -> None:
+        """
+        Append a line (including its line break) to the captured output.
+
+        Args:
+            line (str): The line to append.
+        """
+        self._tail.append(line)
+        self._tail_bytes += len(line)
+        if self._tail_limit is None:
+            return
+        while self._tail_bytes > self._tail_limit and self._tail:
+            old = self._tail.popleft()
+            self._tail_bytes -= len(old)
+            if self.summary_pattern.match(old):
+                self._keep_summary(old)
+            else:
+                self.truncated_bytes += len(old)
+
+    def _keep_summary(self, line: str) -> None:
+        self._summary.append(line)
+        self._summary_bytes += len(line)
+        while self._summary_bytes > self._summary_limit and self._summary:
+            old = self._summary.popleft()
+            self._summary_bytes -= len(old)
+            self.truncated_bytes += len(old)
+
+    def getvalue(self) -> str:
+        """
+        Get the captured output.
+
+        Returns:
+            str: The captured output. If output has been dropped, the retained summary lines are
+            followed by a marker line and the tail of the output.
+        """
+        if not self.truncated_bytes:
+            return "".join([*self._summary, *self._tail])
+        marker = f"[runrestic: {self.truncated_bytes} bytes of output truncated]\n"
+        return "".join([*self._summary, marker, *self._tail])
+
+    def __len__(self) -> int:
+        """
+        Get the size of the captured output.
+
+        Returns:
+            int: The size of the retained output, without the truncation marker.
+        """
+        return self._tail_bytes + self._summary_bytes
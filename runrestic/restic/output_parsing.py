@@ -15,6 +15,21 @@ from runrestic.runrestic.tools import parse_line, parse_size, parse_time
 
 logger = logging.getLogger(__name__)
 
+# Lines the parsers below (and the checks in `ResticRunner.check`) rely on. They are retained when
+# the captured output of a command exceeds its size limit, see `OutputCapture`.
+SUMMARY_PATTERN = re.compile(
+    r"^\s*(?:"
+    r"Files:|Dirs:|Added to the repo|processed [0-9]+ files|"  # backup
+    r"remove [0-9]+ snapshots|"  # forget
+    r"repository contains|[0-9]+ duplicate blobs|found [0-9]+ of|will remove|will delete|"
+    r"remove [0-9]+ old index|"  # prune (restic <0.12.0)
+    r"to repack:|this removes|to delete:|total prune:|remaining:|unused size after prune:|"
+    r"\{|"  # stats --json
+    r"critical|fatal|error|warning|.*Pack ID does not match"
+    r")",
+    re.I,
+)
+
 
 def parse_backup(process_infos: dict[str, Any]) -> dict[str, Any]:
     """
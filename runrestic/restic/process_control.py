@@ -0,0 +1,200 @@
+"""
+This module controls the child processes started by runrestic.
+
+Every restic and hook process is started in a session (and thereby process group) of its own, so
+that it can be killed together with everything it spawned (e.g. the ssh process of an sftp
+repository) without touching runrestic or the other repositories. The process groups are tracked
+here, so that signals received by runrestic can be forwarded to them, see `configure_signals`.
+
+A `Watchdog` enforces `[execution] timeout`: when a command runs for longer, its process group
+receives SIGTERM and, if it is still alive after `TIMEOUT_GRACE` seconds, SIGKILL.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from subprocess import Popen
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Seconds between SIGTERM and SIGKILL for a timed out process group
+TIMEOUT_GRACE = 10
+
+_processes: set[Any] = set()
+_processes_lock = threading.Lock()
+
+
+def signal_process_group(
+    process: "Popen[str] | asyncio.subprocess.Process", sig: int
+) -> None:
+    """
+    Send a signal to the process group of a child process, ignoring groups that are gone.
+
+    Args:
+        process (Popen[str] | asyncio.subprocess.Process): A process started in its own session.
+        sig (int): The signal to send.
+    """
+    pid = process.pid
+    try:
+        # never signal pid 0 or below, which would address runrestic's own process group
+        if isinstance(pid, int) and pid > 0:
+            os.killpg(pid, sig)
+        else:
+            process.send_signal(sig)
+    except ProcessLookupError:
+        pass
+
+
+def signal_process_groups(sig: int) -> None:
+    """
+    Forward a signal to the process groups of all running child processes.
+
+    Args:
+        sig (int): The signal to forward.
+    """
+    with _processes_lock:
+        processes = list(_processes)
+    for process in processes:
+        signal_process_group(process, sig)
+
+
+def exit_status(returncode: int) -> int:
+    """
+    Map the return code of a process killed by a signal to the shell convention of 128 + signal.
+
+    Args:
+        returncode (int): The return code as reported by `subprocess`, negative for signals.
+
+    Returns:
+        int: The return code, positive for every failure.
+    """
+    return 128 - returncode if returncode < 0 else returncode
+
+
+def is_running(process: "Popen[str] | asyncio.subprocess.Process") -> bool:
+    """
+    Check whether a child process is still running.
+
+    Args:
+        process (Popen[str] | asyncio.subprocess.Process): The process to check.
+
+    Returns:
+        bool: True if the process has not exited yet.
+    """
+    if isinstance(process, asyncio.subprocess.Process):
+        return process.returncode is None
+    return process.poll() is None
+
+
+class Watchdog:
+    """
+    Kill the process group of a command that exceeds its timeout.
+
+    Attributes:
+        process (Popen[str] | asyncio.subprocess.Process): The supervised process.
+        timeout (int | None): Timeout in seconds, None for no timeout.
+        proc_cmd (str): Name of the command (as it should appear in the logs).
+        expired (bool): Whether the timeout has been reached.
+    """
+
+    def __init__(
+        self,
+        process: "Popen[str] | asyncio.subprocess.Process",
+        timeout: int | None,
+        proc_cmd: str,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> None:
+        """
+        Initialize the watchdog.
+
+        Args:
+            process (Popen[str] | asyncio.subprocess.Process): The process to supervise.
+            timeout (int | None): Timeout in seconds, None for no timeout.
+            proc_cmd (str): Name of the command (as it should appear in the logs).
+            loop (asyncio.AbstractEventLoop | None): Event loop to schedule the timeout on. Without
+                a loop, timer threads are used.
+        """
+        self.process = process
+        self.timeout = timeout
+        self.proc_cmd = proc_cmd
+        self.loop = loop
+        self.expired = False
+        self._start = time.monotonic()
+        self._timers: list[threading.Timer | asyncio.TimerHandle] = []
+
+    def start(self) -> None:
+        """Start the countdown."""
+        self._start = time.monotonic()
+        if self.timeout is not None:
+            self._schedule(self.timeout, self._expire)
+
+    def cancel(self) -> None:
+        """Stop the countdown and any pending SIGKILL."""
+        for timer in self._timers:
+            timer.cancel()
+        self._timers.clear()
+
+    def _schedule(self, delay: float, callback: Any) -> None:
+        if self.loop is not None:
+            self._timers.append(self.loop.call_later(delay, callback))
+        else:
+            timer = threading.Timer(delay, callback)
+            timer.daemon = True
+            timer.start()
+            self._timers.append(timer)
+
+    def _expire(self) -> None:
+        self.expired = True
+        logger.error(
+            "Command '%s' timed out after %s sec, terminating its process group",
+            self.proc_cmd,
+            round(time.monotonic() - self._start, 1),
+        )
+        signal_process_group(self.process, signal.SIGTERM)
+        self._schedule(TIMEOUT_GRACE, self._kill)
+
+    def _kill(self) -> None:
+        if is_running(self.process):
+            logger.error(
+                "Command '%s' did not terminate within %s sec, killing its process group",
+                self.proc_cmd,
+                TIMEOUT_GRACE,
+            )
+            signal_process_group(self.process, signal.SIGKILL)
+
+
+@contextmanager
+def supervise(
+    process: "Popen[str] | asyncio.subprocess.Process",
+    timeout: int | None,
+    proc_cmd: str,
+    loop: asyncio.AbstractEventLoop | None = None,
+) -> Iterator[Watchdog]:
+    """
+    Track a child process for signal forwarding and enforce its timeout for the `with` block.
+
+    Args:
+        process (Popen[str] | asyncio.subprocess.Process): A process started in its own session.
+        timeout (int | None): Timeout in seconds, None for no timeout.
+        proc_cmd (str): Name of the command (as it should appear in the logs).
+        loop (asyncio.AbstractEventLoop | None): Event loop to schedule the timeout on.
+
+    Yields:
+        Watchdog: The watchdog of the process. Check `expired` after the process has exited.
+    """
+    watchdog = Watchdog(process, timeout, proc_cmd, loop)
+    with _processes_lock:
+        _processes.add(process)
+    watchdog.start()
+    try:
+        yield watchdog
+    finally:
+        watchdog.cancel()
+        with _processes_lock:
+            _processes.discard(process)
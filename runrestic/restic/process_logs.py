@@ -0,0 +1,152 @@
+"""
+This module provides on-disk log files for the complete output of restic and hook processes.
+
+With `[execution] log_dir` set, the output of every try is streamed into its own compressed file
+`<log_dir>/<config>/<repository>/<action>/<timestamp>-try<N>.log.gz` while the process runs. Only
+the bounded `OutputCapture` stays in memory. `log_retention_bytes` limits the total size of the
+log directory by removing the oldest files.
+"""
+
+import gzip
+import logging
+import os
+import re
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import IO, Any
+
+logger = logging.getLogger(__name__)
+
+_re_unsafe = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def log_name(*parts: str) -> str:
+    """
+    Build the relative directory of a command's log files from its config, repository and action.
+
+    Args:
+        *parts (str): The path components, e.g. config name, repository and action.
+
+    Returns:
+        str: A relative path with every component reduced to file name safe characters.
+
+    Examples:
+        >>> log_name("my config", "sftp:user@host:/srv/restic", "backup")
+        'my_config/sftp_user_host_srv_restic/backup'
+    """
+    return "/".join(_re_unsafe.sub("_", part).strip("_") or "_" for part in parts)
+
+
+def open_log_file(
+    log_dir: str, name: str, current_try: int, compression: str = "gzip"
+) -> tuple[IO[str], str]:
+    """
+    Create and open the log file for one try of a command.
+
+    Args:
+        log_dir (str): Base directory for log files.
+        name (str): Relative directory of the command's log files, see `log_name`.
+        current_try (int): Number of the try, starting at 1.
+        compression (str): "gzip" or "zstd". Falls back to gzip if no zstd module is available.
+
+    Returns:
+        tuple[IO[str], str]: The opened text stream and the path of the file.
+    """
+    directory = os.path.join(log_dir, name)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    base = os.path.join(directory, f"{time.strftime('%Y%m%dT%H%M%S')}-try{current_try}")
+
+    if compression == "zstd":
+        stream = _open_zstd(f"{base}.log.zst")
+        if stream is not None:
+            return stream, f"{base}.log.zst"
+        logger.warning("No zstd module available, falling back to gzip for %s", base)
+
+    return gzip.open(f"{base}.log.gz", "wt", encoding="utf-8"), f"{base}.log.gz"
+
+
+def _open_zstd(path: str) -> IO[str] | None:
+    """
+    Open a zstd compressed text stream with the standard library (Python 3.14+) or `zstandard`.
+
+    Args:
+        path (str): Path of the file to create.
+
+    Returns:
+        IO[str] | None: The opened stream, or None if no zstd implementation is installed.
+    """
+    try:
+        from compression import zstd  # type: ignore[import-not-found]  # noqa: PLC0415
+
+        return zstd.open(path, "wt", encoding="utf-8")  # type: ignore[no-any-return]
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore[import-not-found]  # noqa: PLC0415
+
+        return zstandard.open(path, "wt", encoding="utf-8")  # type: ignore[no-any-return]
+    except ImportError:
+        return None
+
+
+def prune_log_files(log_dir: str, max_bytes: int) -> None:
+    """
+    Remove the oldest log files until the log directory is at most `max_bytes` in size.
+
+    Args:
+        log_dir (str): Base directory for log files.
+        max_bytes (int): Maximum total size of all log files.
+    """
+    files: list[tuple[float, int, str]] = []
+    for root, _dirs, filenames in os.walk(log_dir):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # removed concurrently
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _mtime, size, _path in files)
+    for _mtime, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        logger.debug("Removing log file %s", path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:  # removed concurrently
+            pass
+        total -= size
+
+
+@contextmanager
+def process_log_file(
+    config: dict[str, Any], name: str | None, current_try: int
+) -> Iterator[tuple[IO[str] | None, str | None]]:
+    """
+    Open the log file for one try of a command if `log_dir` is configured.
+
+    The file is closed and the retention limit applied when the `with` block ends.
+
+    Args:
+        config (dict[str, Any]): Configuration dictionary for command execution.
+        name (str | None): Relative directory of the command's log files, None to disable logging.
+        current_try (int): Number of the try, starting at 1.
+
+    Yields:
+        tuple[IO[str] | None, str | None]: The opened stream and its path, or (None, None).
+    """
+    if not config.get("log_dir") or name is None:
+        yield None, None
+        return
+
+    stream, path = open_log_file(
+        config["log_dir"], name, current_try, config.get("log_compression", "gzip")
+    )
+    try:
+        yield stream, path
+    finally:
+        stream.close()
+        if config.get("log_retention_bytes"):
+            prune_log_files(config["log_dir"], config["log_retention_bytes"])
@@ -0,0 +1,190 @@
+"""
+This module decides whether and when a failed command is retried.
+
+Failures are classified by the output of the failed try:
+
+- `lock`: the repository is locked by another restic process
+- `rate_limit`: the backend throttles requests (HTTP 429, S3 "SlowDown", ...)
+- `network`: timeouts, refused or reset connections, DNS failures
+- `fatal`: configuration errors that no retry can fix (wrong password, missing repository, ...)
+- `other`: everything else
+- `timeout`: the command exceeded `[execution] timeout` (determined by the watchdog, not the output)
+- `timeout`: the command exceeded `[execution] timeout` (determined by the watchdog, not the output)
+
+Each class can have its own backoff in `[execution.retry_policy]`, using the same format as
+`retry_backoff`, or "never" to not retry at all. Classes without an entry use `retry_backoff`,
+except `fatal`, which is not retried by default. `retry_jitter` spreads the delays with
+decorrelated jitter, so that repositories failing at the same time do not retry in lockstep,
+`retry_max_delay` caps every delay and `retry_deadline` bounds the total time spent on a command.
+"""
+
+import logging
+import random
+import re
+import time
+from typing import Any
+
+from runrestic.runrestic.tools import parse_time
+
+logger = logging.getLogger(__name__)
+
+# Checked in this order, the first matching class wins
+FAILURE_CLASSES: dict[str, re.Pattern[str]] = {
+    "lock": re.compile(
+        r"repository is already locked|unable to create lock|Fatal: unable to acquire lock",
+        re.IGNORECASE,
+    ),
+    "rate_limit": re.compile(
+        r"\b429\b|too many requests|SlowDown|rate ?limit|RequestLimitExceeded|throttl",
+        re.IGNORECASE,
+    ),
+    "network": re.compile(
+        r"timeout|timed out|connection (?:refused|reset|closed)|broken pipe|"
+        r"no such host|network is unreachable|no route to host|unexpected EOF|"
+        r"temporary failure in name resolution",
+        re.IGNORECASE,
+    ),
+    "fatal": re.compile(
+        r"Fatal: (?:wrong password|unable to open config file|invalid|repository does not exist|"
+        r"no repository given|Please specify repository)|unknown (?:flag|command|shorthand flag)",
+        re.IGNORECASE,
+    ),
+}
+
+NEVER = "never"
+
+
+def classify_failure(output: str) -> str:
+    """
+    Classify a failed try by its output.
+
+    Args:
+        output (str): The captured output of the failed try.
+
+    Returns:
+        str: One of "lock", "rate_limit", "network", "fatal" or "other".
+    """
+    for failure_class, pattern in FAILURE_CLASSES.items():
+        if pattern.search(output):
+            return failure_class
+    return "other"
+
+
+class RetryPolicy:
+    """
+    The retry policy of one command, built from its execution configuration.
+
+    Attributes:
+        tries_total (int): Maximum number of tries, including the first one.
+        backoff (dict[str, str]): Backoff per failure class, "never" for no retries.
+        jitter (bool): Whether delays are spread with decorrelated jitter.
+        max_delay (int | None): Upper bound for a single delay in seconds.
+        deadline (int | None): Upper bound for the total time of the command in seconds.
+        slept (float): Total time waited between tries so far.
+    """
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        """
+        Initialize the policy.
+
+        Args:
+            config (dict[str, Any]): Configuration dictionary for command execution.
+        """
+        self.tries_total = config.get("retry_count", 0) + 1
+        default = config.get("retry_backoff", "")
+        self.backoff = dict.fromkeys([*FAILURE_CLASSES, "other", "timeout"], default)
+        self.backoff["fatal"] = NEVER
+        self.backoff.update(config.get("retry_policy", {}))
+        self.jitter = bool(config.get("retry_jitter", False))
+        self.max_delay = (
+            parse_time(config["retry_max_delay"])
+            if config.get("retry_max_delay")
+            else None
+        )
+        self.deadline = (
+            parse_time(config["retry_deadline"])
+            if config.get("retry_deadline")
+            else None
+        )
+        self.slept = 0.0
+        self._start = time.monotonic()
+        self._previous: float | None = None
+
+    def next_delay(self, i: int, failure_class: str, proc_cmd: str) -> float | None:
+        """
+        Decide whether to retry after a failed try and how long to wait before.
+
+        Args:
+            i (int): Zero-based index of the try that just failed.
+            failure_class (str): Class of the failure, see `classify_failure`.
+            proc_cmd (str): Name of the executed command (as it should appear in the logs).
+
+        Returns:
+            float | None: Seconds to wait before the next try (0 to retry right away), or None
+            to give up.
+        """
+        if i + 1 >= self.tries_total:
+            return None
+        backoff = self.backoff.get(failure_class, "")
+        if backoff == NEVER:
+            logger.info(
+                "Not retrying command '%s' after a %s failure", proc_cmd, failure_class
+            )
+            return None
+        if not backoff:
+            logger.info("Retry %s/%s command '%s'", i + 1, self.tries_total, proc_cmd)
+            return 0 if self._within_deadline(0, proc_cmd) else None
+
+        duration_str, _, strategy = backoff.partition(" ")
+        base = parse_time(duration_str)
+        delay: float = strategy_delay(base, strategy, i)
+        if self.jitter:
+            # decorrelated jitter: uniform between the base and three times the previous delay
+            previous = self._previous if self._previous is not None else base
+            delay = min(3 * delay, random.uniform(base, max(base, 3 * previous)))  # noqa: S311
+        if self.max_delay is not None:
+            delay = min(delay, self.max_delay)
+        if not self._within_deadline(delay, proc_cmd):
+            return None
+        self._previous = delay
+        self.slept += delay
+        logger.info(
+            "Retry %s/%s command '%s' using %s strategy, duration = %s sec",
+            i + 1,
+            self.tries_total,
+            proc_cmd,
+            strategy or "static",
+            round(delay, 1),
+        )
+        return delay
+
+    def _within_deadline(self, delay: float, proc_cmd: str) -> bool:
+        if self.deadline is None:
+            return True
+        if time.monotonic() - self._start + delay < self.deadline:
+            return True
+        logger.warning(
+            "Not retrying command '%s', retry deadline of %s sec reached",
+            proc_cmd,
+            self.deadline,
+        )
+        return False
+
+
+def strategy_delay(base: int, strategy: str, i: int) -> int:
+    """
+    Compute the delay of a backoff strategy before retry number `i + 1`.
+
+    Args:
+        base (int): The configured duration in seconds.
+        strategy (str): "static", "linear" or "exponential". Anything else is treated as static.
+        i (int): Zero-based index of the try that just failed.
+
+    Returns:
+        int: The delay in seconds.
+    """
+    if strategy == "linear":
+        return base * (i + 1)
+    if strategy == "exponential":
+        return base << i
+    return base
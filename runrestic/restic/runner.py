@@ -13,6 +13,7 @@ from datetime import datetime
 from typing import Any
 
 from runrestic.metrics import write_metrics
+from runrestic.restic.limiter import ConcurrencyLimiter
 from runrestic.restic.output_parsing import (
     parse_backup,
     parse_forget,
@@ -20,10 +21,15 @@ from runrestic.restic.output_parsing import (
     parse_prune,
     parse_stats,
 )
+from runrestic.restic.process_logs import log_name
+from runrestic.restic.repository import Repository
 from runrestic.restic.tools import MultiCommand, initialize_environment, redact_password
 
 logger = logging.getLogger(__name__)
 
+# Actions that can override the `[execution]` settings in a sub-table, e.g. `[execution.check]`
+ACTIONS = ["init", "backup", "unlock", "forget", "prune", "check", "stats"]
+
 
 class ResticRunner:
     """
@@ -37,6 +43,7 @@ class ResticRunner:
         metrics (dict): dictionary to store metrics and errors for operations.
         log_metrics (bool): Flag to determine if metrics should be logged.
         pw_replacement (str): Replacement string for sensitive information in logs.
+        limiter (ConcurrencyLimiter): Concurrency limiter shared by all actions.
     """
 
     def __init__(
@@ -64,8 +71,75 @@ class ResticRunner:
             .get("password_replacement", "")
         )
 
+        execution = self.config.get("execution", {})
+        self.limiter = ConcurrencyLimiter(
+            execution.get("max_concurrency"), execution.get("backend_concurrency")
+        )
+
         initialize_environment(self.config["environment"])
 
+    def execution_config(self, action: str) -> dict[str, Any]:
+        """
+        Build the execution configuration for an action.
+
+        Settings from the action's sub-table (e.g. `[execution.check]`) take precedence over
+        the general `[execution]` settings.
+
+        Args:
+            action (str): Name of the action, e.g. "backup".
+
+        Returns:
+            dict[str, Any]: The effective execution configuration for the action.
+        """
+        execution = {
+            key: value
+            for key, value in self.config["execution"].items()
+            if key not in ACTIONS
+        }
+        execution.update(self.config["execution"].get(action, {}))
+        return execution
+
+    def repo_groups(self) -> list[str]:
+        """
+        Determine the backend group of each repository, used for per-backend concurrency limits.
+
+        Returns:
+            list[str]: The backend group of each repository in `repos`, e.g. "sftp:backup01".
+        """
+        return [Repository.parse(repo).group for repo in self.repos]
+
+    def log_names(self, action: str) -> list[str]:
+        """
+        Determine the log file directory of each repository for an action.
+
+        Args:
+            action (str): Name of the action, e.g. "backup".
+
+        Returns:
+            list[str]: The log file directory of each repository in `repos`, relative to
+            `[execution] log_dir`. Passwords in repository URLs are removed.
+        """
+        return [
+            log_name(self.config.get("name", ""), redact_password(repo, ""), action)
+            for repo in self.repos
+        ]
+
+    def record_retries(self, action: str, cmd_runs: list[dict[str, Any]]) -> None:
+        """
+        Store the retry details of an action's repository commands in the metrics.
+
+        Args:
+            action (str): Name of the action, e.g. "backup".
+            cmd_runs (list[dict[str, Any]]): The process infos of the action, one per repository.
+        """
+        retries = self.metrics.setdefault("retries", {}).setdefault(action, {})
+        for repo, process_infos in zip(self.repos, cmd_runs, strict=False):
+            retries[redact_password(repo, self.pw_replacement)] = {
+                "tries": process_infos.get("current_try", 1),
+                "sleep_seconds": process_infos.get("retry_sleep_seconds", 0.0),
+                "failure_class": process_infos.get("failure_class"),
+            }
+
     def run(self) -> int:  # noqa: C901
         """
         Execute the specified Restic actions in sequence.
@@ -131,8 +205,14 @@ class ResticRunner:
 
         direct_abort_reasons = ["config file already exists"]
         cmd_runs = MultiCommand(
-            commands, self.config["execution"], direct_abort_reasons
+            commands,
+            self.execution_config("init"),
+            direct_abort_reasons,
+            limiter=self.limiter,
+            groups=self.repo_groups(),
+            log_names=self.log_names("init"),
         ).run()
+        self.record_retries("init", cmd_runs)
 
         for process_infos in cmd_runs:
             if process_infos["output"][-1][0] > 0:
@@ -147,12 +227,19 @@ class ResticRunner:
         metrics = self.metrics["backup"] = {}
         cfg = self.config["backup"]
 
-        hooks_cfg = self.config["execution"].copy()
+        # hooks always run one after another, outside of the shared limiter
+        hooks_cfg = self.execution_config("backup")
+        hooks_cfg.pop("max_concurrency", None)
         hooks_cfg.update({"parallel": False, "shell": True})
 
         # backup pre_hooks
         if cfg.get("pre_hooks"):
-            cmd_runs = MultiCommand(cfg["pre_hooks"], config=hooks_cfg).run()
+            cmd_runs = MultiCommand(
+                cfg["pre_hooks"],
+                config=hooks_cfg,
+                log_names=[log_name(self.config.get("name", ""), "hooks", "pre_hooks")]
+                * len(cfg["pre_hooks"]),
+            ).run()
             metrics["_restic_pre_hooks"] = {
                 "duration_seconds": sum([v["time"] for v in cmd_runs]),
                 "rc": sum(x["output"][-1][0] for x in cmd_runs),
@@ -188,8 +275,14 @@ class ResticRunner:
             "Fatal: wrong password",
         ]
         cmd_runs = MultiCommand(
-            commands, self.config["execution"], direct_abort_reasons
+            commands,
+            self.execution_config("backup"),
+            direct_abort_reasons,
+            limiter=self.limiter,
+            groups=self.repo_groups(),
+            log_names=self.log_names("backup"),
         ).run()
+        self.record_retries("backup", cmd_runs)
 
         for repo, process_infos in zip(self.repos, cmd_runs, strict=False):
             return_code = process_infos["output"][-1][0]
@@ -206,7 +299,12 @@ class ResticRunner:
 
         # backup post_hooks
         if cfg.get("post_hooks"):
-            cmd_runs = MultiCommand(cfg["post_hooks"], config=hooks_cfg).run()
+            cmd_runs = MultiCommand(
+                cfg["post_hooks"],
+                config=hooks_cfg,
+                log_names=[log_name(self.config.get("name", ""), "hooks", "post_hooks")]
+                * len(cfg["post_hooks"]),
+            ).run()
             metrics["_restic_post_hooks"] = {
                 "duration_seconds": sum(v["time"] for v in cmd_runs),
                 "rc": sum(x["output"][-1][0] for x in cmd_runs),
@@ -226,9 +324,13 @@ class ResticRunner:
 
         cmd_runs = MultiCommand(
             commands,
-            config=self.config["execution"],
+            config=self.execution_config("unlock"),
             abort_reasons=direct_abort_reasons,
+            limiter=self.limiter,
+            groups=self.repo_groups(),
+            log_names=self.log_names("unlock"),
         ).run()
+        self.record_retries("unlock", cmd_runs)
         for process_infos in cmd_runs:
             if process_infos["output"][-1][0] > 0:
                 logger.warning(process_infos["output"])
@@ -263,9 +365,13 @@ class ResticRunner:
         ]
         cmd_runs = MultiCommand(
             commands,
-            config=self.config["execution"],
+            config=self.execution_config("forget"),
             abort_reasons=direct_abort_reasons,
+            limiter=self.limiter,
+            groups=self.repo_groups(),
+            log_names=self.log_names("forget"),
         ).run()
+        self.record_retries("forget", cmd_runs)
 
         for repo, process_infos in zip(self.repos, cmd_runs, strict=False):
             return_code = process_infos["output"][-1][0]
@@ -295,9 +401,13 @@ class ResticRunner:
         ]
         cmd_runs = MultiCommand(
             commands,
-            config=self.config["execution"],
+            config=self.execution_config("prune"),
             abort_reasons=direct_abort_reasons,
+            limiter=self.limiter,
+            groups=self.repo_groups(),
+            log_names=self.log_names("prune"),
         ).run()
+        self.record_retries("prune", cmd_runs)
 
         for repo, process_infos in zip(self.repos, cmd_runs, strict=False):
             return_code = process_infos["output"][-1][0]
@@ -344,9 +454,13 @@ class ResticRunner:
         logger.debug("Starting check with commands: %s", commands)
         cmd_runs = MultiCommand(
             commands,
-            config=self.config["execution"],
+            config=self.execution_config("check"),
             abort_reasons=direct_abort_reasons,
+            limiter=self.limiter,
+            groups=self.repo_groups(),
+            log_names=self.log_names("check"),
         ).run()
+        self.record_retries("check", cmd_runs)
         logger.debug("Finished checks for repos: %s", self.repos)
 
         for repo, process_infos in zip(self.repos, cmd_runs, strict=False):
@@ -390,9 +504,13 @@ class ResticRunner:
         ]
         cmd_runs = MultiCommand(
             commands,
-            config=self.config["execution"],
+            config=self.execution_config("stats"),
             abort_reasons=direct_abort_reasons,
+            limiter=self.limiter,
+            groups=self.repo_groups(),
+            log_names=self.log_names("stats"),
         ).run()
+        self.record_retries("stats", cmd_runs)
 
         for repo, process_infos in zip(self.repos, cmd_runs, strict=False):
             return_code = process_infos["output"][-1][0]
@@ -2,33 +2,59 @@
 This module provides utility functions and classes to support Restic operations.
 
 It includes:
-- `MultiCommand` for executing multiple commands in parallel or sequentially.
+- `MultiCommand` for executing multiple commands in parallel or sequentially, either on a
+  thread pool or on a single asyncio event loop.
 - Functions for logging process output, retrying commands, initializing environment variables,
   and redacting sensitive information from logs.
 """
 
+import asyncio
 import logging
 import os
 import re
+import signal
 import time
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
 from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from subprocess import PIPE, STDOUT, Popen
 from typing import IO, Any
 
+from runrestic.restic.limiter import ConcurrencyLimiter, Slot, concurrency_limit
+from runrestic.restic.output_capture import MAX_OUTPUT_BYTES, OutputCapture
+from runrestic.restic.process_control import (
+    exit_status,
+    signal_process_group,
+    supervise,
+)
+from runrestic.restic.process_logs import process_log_file
+from runrestic.restic.retry_policy import RetryPolicy, classify_failure
 from runrestic.runrestic.tools import parse_time
 
 logger = logging.getLogger(__name__)
 
+# Maximum line length for output read by the asyncio engine
+STREAM_LIMIT = 1 << 20
+
 
 class MultiCommand:
     """
     A class to execute multiple commands in parallel or sequentially, with support for retries and abort conditions.
 
+    The commands are executed on a thread pool by default. With `engine = "asyncio"` in the
+    execution config, all commands are spawned with `asyncio.create_subprocess_exec` and
+    their output is streamed on a single event loop instead.
+
+    How many commands run at the same time is decided by a `ConcurrencyLimiter`, which can be
+    shared with other `MultiCommand` instances to enforce a common budget.
+
     Attributes:
         commands (Sequence[list[str] | str]): List of commands to execute.
         config (dict): Configuration dictionary for command execution.
         abort_reasons (list[str] | None): List of reasons to abort execution if found in the output.
+        limiter (ConcurrencyLimiter): Limiter bounding the number of concurrently running commands.
+        groups (Sequence[str | None]): Limiter group of each command, e.g. the backend of its repository.
+        log_names (Sequence[str | None]): Log file directory of each command, see `process_logs`.
     """
 
     def __init__(
@@ -36,6 +62,9 @@ class MultiCommand:
         commands: Sequence[list[str] | str],
         config: dict[str, Any],
         abort_reasons: list[str] | None = None,
+        limiter: ConcurrencyLimiter | None = None,
+        groups: Sequence[str | None] | None = None,
+        log_names: Sequence[str | None] | None = None,
     ) -> None:
         """
         Initialize the MultiCommand instance.
@@ -44,11 +73,20 @@ class MultiCommand:
             commands (Sequence[list[str] | str]): List of commands to execute.
             config (dict): Configuration dictionary for command execution.
             abort_reasons (list[str] | None): List of reasons to abort execution if found in the output.
+            limiter (ConcurrencyLimiter | None): Shared limiter to use. If None, a private limiter
+                is created and only the limit derived from `config` applies.
+            groups (Sequence[str | None] | None): Limiter group of each command, in the order of
+                `commands`. If None, the commands do not belong to any group.
+            log_names (Sequence[str | None] | None): Log file directory of each command, relative
+                to `log_dir`, in the order of `commands`. If None, no log files are written.
         """
         self.processes: list[Future[dict[str, Any]]] = []
         self.commands = commands
         self.config = config
         self.abort_reasons = abort_reasons
+        self.limiter = limiter or ConcurrencyLimiter()
+        self.groups = groups or [None] * len(commands)
+        self.log_names = log_names or [None] * len(commands)
 
     def run(self) -> list[dict[str, Any]]:
         """
@@ -57,15 +95,19 @@ class MultiCommand:
         Returns:
             list[dict[str, Any]]: List of results for each command.
         """
-        max_workers = len(self.commands) if self.config["parallel"] else 1
+        if self.config.get("engine") == "asyncio":
+            return asyncio.run(self.run_async())
+
+        # Slots are requested up front so they are granted in command order. Every command
+        # gets its own worker; the limiter decides how many of them actually run.
+        limit = concurrency_limit(self.config)
+        slots = [self.limiter.request(limit, group) for group in self.groups]
         processes: list[Future[dict[str, Any]]] = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            for command in self.commands:
-                logger.debug("Spawning %s", command)
-                fut = executor.submit(
-                    retry_process, command, self.config, self.abort_reasons
-                )
-                logger.debug("Done command: %s", command)
+        with ThreadPoolExecutor(max_workers=max(len(self.commands), 1)) as executor:
+            for command, slot, log_name in zip(
+                self.commands, slots, self.log_names, strict=True
+            ):
+                fut = executor.submit(self._run_in_slot, command, slot, log_name)
                 processes.append(fut)
 
             # collect results; exceptions propagate
@@ -74,44 +116,244 @@ class MultiCommand:
         # executor automatically shutdowns here
         return results
 
+    def _run_in_slot(
+        self, command: list[str] | str, slot: Slot, log_name: str | None
+    ) -> dict[str, Any]:
+        """
+        Wait for the slot, run the command and release the slot again.
 
-def log_messages(message: IO[str] | None, proc_cmd: str) -> str:
+        Args:
+            command (list[str] | str): Command to execute.
+            slot (Slot): Slot requested for this command.
+            log_name (str | None): Log file directory of the command.
+
+        Returns:
+            dict[str, Any]: Status and output of the command execution.
+        """
+        try:
+            slot.wait()
+            logger.debug("Spawning %s", command)
+            result = retry_process(command, self.config, self.abort_reasons, log_name)
+            logger.debug("Done command: %s", command)
+            return result
+        finally:
+            slot.release()
+
+    async def run_async(self) -> list[dict[str, Any]]:
+        """
+        Execute all commands on the running event loop and collect their results.
+
+        Returns:
+            list[dict[str, Any]]: List of results for each command, in the order of `commands`.
+        """
+        limit = concurrency_limit(self.config)
+        slots = [self.limiter.request(limit, group) for group in self.groups]
+
+        async def run_one(
+            command: list[str] | str, slot: Slot, log_name: str | None
+        ) -> dict[str, Any]:
+            try:
+                await slot.wait_async()
+                logger.debug("Spawning %s", command)
+                result = await async_retry_process(
+                    command, self.config, self.abort_reasons, log_name
+                )
+                logger.debug("Done command: %s", command)
+                return result
+            finally:
+                slot.release()
+
+        return list(
+            await asyncio.gather(
+                *(
+                    run_one(cmd, slot, log_name)
+                    for cmd, slot, log_name in zip(
+                        self.commands, slots, self.log_names, strict=True
+                    )
+                )
+            )
+        )
+
+
+def log_line(log_out: str, proc_cmd: str) -> None:
+    """
+    Log a single line of process output at a level derived from its content.
+
+    Args:
+        log_out (str): One line of process output.
+        proc_cmd (str): Name of the executed command (as it should appear in the logs).
+    """
+    if re.match(r"^critical|fatal", log_out, re.I):
+        proc_log_level = logging.CRITICAL
+    elif re.match(r"^error", log_out, re.I):
+        proc_log_level = logging.ERROR
+    elif re.match(r"^warning", log_out, re.I):
+        proc_log_level = logging.WARNING
+    elif re.match(r"^unchanged\s+/", log_out, re.I):  # unchanged files in restic output
+        proc_log_level = logging.DEBUG
+    else:
+        proc_log_level = logging.INFO
+    logger.log(proc_log_level, "[%s] %s", proc_cmd, log_out.strip())
+
+
+class AbortMatcher:
+    """
+    Match abort reasons in process output while it is being read.
+
+    All abort reasons are compiled into one alternation, so each line is scanned once no matter
+    how many reasons there are. The first match calls `on_match`, e.g. to terminate the process
+    instead of waiting for it to give up by itself.
+
+    Attributes:
+        abort_reasons (list[str]): Reasons to abort execution if found in the output.
+        found (list[str]): Abort reasons found so far, in the order of `abort_reasons`.
+    """
+
+    def __init__(
+        self,
+        abort_reasons: list[str] | None,
+        on_match: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Initialize the matcher.
+
+        Args:
+            abort_reasons (list[str] | None): Reasons to abort execution if found in the output.
+            on_match (Callable[[], None] | None): Called once, when the first abort reason is found.
+        """
+        self.abort_reasons = abort_reasons or []
+        self.found: list[str] = []
+        self._on_match = on_match
+        self._pattern = (
+            re.compile("|".join(re.escape(reason) for reason in self.abort_reasons))
+            if self.abort_reasons
+            else None
+        )
+
+    def feed(self, line: str) -> None:
+        """
+        Scan one line of output for abort reasons.
+
+        Args:
+            line (str): One line of process output.
+        """
+        if self._pattern is None:
+            return
+        matches = {match.group(0) for match in self._pattern.finditer(line)}
+        if not matches.difference(self.found):
+            return
+        first = not self.found
+        self.found = [
+            reason
+            for reason in self.abort_reasons
+            if reason in matches or reason in self.found
+        ]
+        if first and self._on_match is not None:
+            self._on_match()
+
+    def should_abort(self, proc_cmd: str) -> bool:
+        """
+        Check whether an abort reason was found, and log it if so.
+
+        Args:
+            proc_cmd (str): Name of the executed command (as it should appear in the logs).
+
+        Returns:
+            bool: True if no further tries should be made.
+        """
+        if self.found:
+            logger.error("Aborting '%s' because of %s", proc_cmd, self.found)
+        return bool(self.found)
+
+
+def terminate_process(process: "Popen[str] | asyncio.subprocess.Process") -> None:
+    """
+    Terminate a running process and everything it spawned, ignoring processes that have exited already.
+
+    Args:
+        process (Popen[str] | asyncio.subprocess.Process): The process to terminate.
+    """
+    signal_process_group(process, signal.SIGTERM)
+
+
+def log_messages(
+    message: Iterable[str] | None,
+    proc_cmd: str,
+    max_bytes: int | None = MAX_OUTPUT_BYTES,
+    log_file: IO[str] | None = None,
+    abort_matcher: AbortMatcher | None = None,
+) -> str:
     """
     Capture the process output and generate appropriate log messages.
 
     Args:
-        message (IO[str] | None): Process output message.
+        message (Iterable[str] | None): Process output message.
         proc_cmd (str): Name of the executed command (as it should appear in the logs).
+        max_bytes (int | None): Size limit for the captured output, see `OutputCapture`.
+        log_file (IO[str] | None): Stream receiving the complete output, see `process_logs`.
+        abort_matcher (AbortMatcher | None): Matcher fed with every line of output.
 
     Returns:
-        str: Complete process output.
+        str: Process output, reduced to its summary and tail if it exceeds `max_bytes`.
     """
     if message is None:
         return ""
-    output = ""
+    output = OutputCapture(max_bytes)
     for log_out in message:
+        if log_file is not None:
+            log_file.write(log_out)
         if log_out.strip():
-            output += log_out
-            if re.match(r"^critical|fatal", log_out, re.I):
-                proc_log_level = logging.CRITICAL
-            elif re.match(r"^error", log_out, re.I):
-                proc_log_level = logging.ERROR
-            elif re.match(r"^warning", log_out, re.I):
-                proc_log_level = logging.WARNING
-            elif re.match(
-                r"^unchanged\s+/", log_out, re.I
-            ):  # unchanged files in restic output
-                proc_log_level = logging.DEBUG
-            else:
-                proc_log_level = logging.INFO
-            logger.log(proc_log_level, "[%s] %s", proc_cmd, log_out.strip())
-    return output
+            output.append(log_out)
+            log_line(log_out, proc_cmd)
+            if abort_matcher is not None:
+                abort_matcher.feed(log_out)
+    return output.getvalue()
+
+
+async def async_log_messages(
+    message: asyncio.StreamReader | None,
+    proc_cmd: str,
+    max_bytes: int | None = MAX_OUTPUT_BYTES,
+    log_file: IO[str] | None = None,
+    abort_matcher: AbortMatcher | None = None,
+) -> str:
+    """
+    Capture the output of an asyncio subprocess and generate appropriate log messages.
+
+    Args:
+        message (asyncio.StreamReader | None): Process output stream.
+        proc_cmd (str): Name of the executed command (as it should appear in the logs).
+        max_bytes (int | None): Size limit for the captured output, see `OutputCapture`.
+        log_file (IO[str] | None): Stream receiving the complete output, see `process_logs`.
+        abort_matcher (AbortMatcher | None): Matcher fed with every line of output.
+
+    Returns:
+        str: Process output, reduced to its summary and tail if it exceeds `max_bytes`.
+    """
+    if message is None:
+        return ""
+
+    async def lines() -> AsyncIterator[str]:
+        async for raw in message:
+            yield raw.decode("UTF-8")
+
+    output = OutputCapture(max_bytes)
+    async for log_out in lines():
+        if log_file is not None:
+            log_file.write(log_out)
+        if log_out.strip():
+            output.append(log_out)
+            log_line(log_out, proc_cmd)
+            if abort_matcher is not None:
+                abort_matcher.feed(log_out)
+    return output.getvalue()
 
 
 def retry_process(
     cmd: str | list[str],
     config: dict[str, Any],
     abort_reasons: list[str] | None = None,
+    log_name: str | None = None,
 ) -> dict[str, Any]:
     """
     Execute a command with retries and optional abort conditions.
@@ -120,6 +362,8 @@ def retry_process(
         cmd (str | list[str]): Command to execute.
         config (dict[str, Any]): Configuration dictionary for command execution.
         abort_reasons (list[str] | None): List of reasons to abort execution if found in the output.
+        log_name (str | None): Log file directory of the command, relative to `log_dir`. The
+            complete output of every try is written there and listed in `log_files`.
 
     Returns:
         dict[str, Any]: Status and output of the command execution.
@@ -127,71 +371,181 @@ def retry_process(
     start_time = time.time()
 
     shell = config.get("shell", False)
-    tries_total = config.get("retry_count", 0) + 1
-    status = {"current_try": 0, "tries_total": tries_total, "output": []}
-    proc_cmd = (
-        cmd[0]
-        if isinstance(cmd, list)
-        else os.path.basename(cmd.split(" ", maxsplit=1)[0])
-    )
-    for i in range(tries_total):
+    timeout = parse_time(config["timeout"]) if config.get("timeout") else None
+    policy = RetryPolicy(config)
+    status: dict[str, Any] = {
+        "current_try": 0,
+        "tries_total": policy.tries_total,
+        "output": [],
+        "failure_class": None,
+        "retry_sleep_seconds": 0.0,
+    }
+    proc_cmd = process_name(cmd)
+    max_bytes = config.get("max_output_bytes", MAX_OUTPUT_BYTES)
+    for i in range(policy.tries_total):
         status["current_try"] = i + 1
 
-        with Popen(  # noqa: S603
-            cmd, stdout=PIPE, stderr=STDOUT, shell=shell, encoding="UTF-8"
-        ) as process:
-            output = log_messages(process.stdout, proc_cmd)
-        returncode = process.returncode
+        with (
+            process_log_file(config, log_name, i + 1) as (log_file, log_path),
+            Popen(  # noqa: S603
+                cmd,
+                stdout=PIPE,
+                stderr=STDOUT,
+                shell=shell,
+                encoding="UTF-8",
+                start_new_session=True,
+            ) as process,
+            supervise(process, timeout, proc_cmd) as watchdog,
+        ):
+            abort_matcher = AbortMatcher(
+                abort_reasons, on_match=partial(terminate_process, process)
+            )
+            output = log_messages(
+                process.stdout, proc_cmd, max_bytes, log_file, abort_matcher
+            )
+            process.wait()
+        returncode = exit_status(process.returncode)
+        if log_path:
+            status.setdefault("log_files", []).append(log_path)
         status["output"].append((returncode, output))
         if returncode == 0:
+            status["failure_class"] = None
             break
-
-        if abort_reasons and any(
-            abort_reason in output for abort_reason in abort_reasons
-        ):
-            logger.error(
-                "Aborting '%s' because of %s",
-                proc_cmd,
-                [
-                    abort_reason
-                    for abort_reason in abort_reasons
-                    if abort_reason in output
-                ],
-            )
+        status["failure_class"] = (
+            "timeout" if watchdog.expired else classify_failure(output)
+        )
+        logger.info(
+            "Command '%s' failed with return code %s (%s failure)",
+            proc_cmd,
+            returncode,
+            status["failure_class"],
+        )
+        if abort_matcher.should_abort(proc_cmd):
             break
-        if config.get("retry_backoff"):
-            if " " in config["retry_backoff"]:
-                duration, strategy = config["retry_backoff"].split(" ")
-            else:
-                duration, strategy = config["retry_backoff"], None
-            duration = parse_time(duration)
-            logger.info(
-                "Retry %s/%s command '%s' using %s strategy, duration = %s sec",
-                i + 1,
-                tries_total,
-                proc_cmd,
-                strategy,
-                duration,
-            )
+        duration = policy.next_delay(i, status["failure_class"], proc_cmd)
+        if duration is None:
+            break
+        if duration:
+            time.sleep(duration)
+            status["retry_sleep_seconds"] = policy.slept
+
+    status["time"] = time.time() - start_time
+    return status
+
+
+async def async_retry_process(
+    cmd: str | list[str],
+    config: dict[str, Any],
+    abort_reasons: list[str] | None = None,
+    log_name: str | None = None,
+) -> dict[str, Any]:
+    """
+    Execute a command with retries and optional abort conditions on the running event loop.
+
+    This is the asyncio counterpart of `retry_process` and returns the same status structure.
+    The backoff between tries is awaited, so it does not block any thread.
+
+    Args:
+        cmd (str | list[str]): Command to execute.
+        config (dict[str, Any]): Configuration dictionary for command execution.
+        abort_reasons (list[str] | None): List of reasons to abort execution if found in the output.
+        log_name (str | None): Log file directory of the command, relative to `log_dir`.
+
+    Returns:
+        dict[str, Any]: Status and output of the command execution.
+    """
+    start_time = time.time()
+
+    shell = config.get("shell", False)
+    timeout = parse_time(config["timeout"]) if config.get("timeout") else None
+    policy = RetryPolicy(config)
+    status: dict[str, Any] = {
+        "current_try": 0,
+        "tries_total": policy.tries_total,
+        "output": [],
+        "failure_class": None,
+        "retry_sleep_seconds": 0.0,
+    }
+    proc_cmd = process_name(cmd)
+    max_bytes = config.get("max_output_bytes", MAX_OUTPUT_BYTES)
+    for i in range(policy.tries_total):
+        status["current_try"] = i + 1
 
-            if strategy == "linear":
-                time.sleep(duration * (i + 1))
-            elif strategy == "exponential":
-                time.sleep(duration << i)
-            else:  # strategy = "static"
-                time.sleep(duration)
+        if shell:
+            process = await asyncio.create_subprocess_shell(
+                cmd if isinstance(cmd, str) else " ".join(cmd),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=STREAM_LIMIT,
+                start_new_session=True,
+            )
         else:
-            logger.info(
-                "Retry %s/%s command '%s'",
-                i + 1,
-                tries_total,
-                proc_cmd,
+            args = cmd if isinstance(cmd, list) else cmd.split()
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=STREAM_LIMIT,
+                start_new_session=True,
+            )
+        abort_matcher = AbortMatcher(
+            abort_reasons, on_match=partial(terminate_process, process)
+        )
+        with (
+            process_log_file(config, log_name, i + 1) as (log_file, log_path),
+            supervise(
+                process, timeout, proc_cmd, asyncio.get_running_loop()
+            ) as watchdog,
+        ):
+            output = await async_log_messages(
+                process.stdout, proc_cmd, max_bytes, log_file, abort_matcher
             )
+            returncode = exit_status(await process.wait())
+        if log_path:
+            status.setdefault("log_files", []).append(log_path)
+        status["output"].append((returncode, output))
+        if returncode == 0:
+            status["failure_class"] = None
+            break
+        status["failure_class"] = (
+            "timeout" if watchdog.expired else classify_failure(output)
+        )
+        logger.info(
+            "Command '%s' failed with return code %s (%s failure)",
+            proc_cmd,
+            returncode,
+            status["failure_class"],
+        )
+        if abort_matcher.should_abort(proc_cmd):
+            break
+        duration = policy.next_delay(i, status["failure_class"], proc_cmd)
+        if duration is None:
+            break
+        if duration:
+            await asyncio.sleep(duration)
+            status["retry_sleep_seconds"] = policy.slept
 
     status["time"] = time.time() - start_time
     return status
 
 
+def process_name(cmd: str | list[str]) -> str:
+    """
+    Derive the name of a command as it should appear in the logs.
+
+    Args:
+        cmd (str | list[str]): Command to execute.
+
+    Returns:
+        str: The executable name of the command.
+    """
+    return (
+        cmd[0]
+        if isinstance(cmd, list)
+        else os.path.basename(cmd.split(" ", maxsplit=1)[0])
+    )
+
+
 def initialize_environment(config: dict[str, Any]) -> None:
     """
     Set environment variables based on the provided configuration.
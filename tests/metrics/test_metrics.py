@@ -390,3 +390,33 @@ class TestResticMetricsPrometheus(TestCase):
                 ]
             ),
         )
+
+    def test_retry_metrics(self):
+        metrics = {
+            "backup": {
+                "/srv/restic-repo1": {
+                    "tries": 1,
+                    "sleep_seconds": 0.0,
+                    "failure_class": None,
+                },
+                "/srv/restic-repo2": {
+                    "tries": 3,
+                    "sleep_seconds": 90.0,
+                    "failure_class": "lock",
+                },
+            },
+        }
+        lines = prometheus.retry_metrics(metrics, "my_retries")
+        self.assertIn(
+            'restic_retry_tries{config="my_retries",action="backup",repository="/srv/restic-repo2"} 3\n',
+            lines,
+        )
+        self.assertIn(
+            'restic_retry_sleep_seconds{config="my_retries",action="backup",repository="/srv/restic-repo2"} 90.0\n',
+            lines,
+        )
+        self.assertIn(
+            'restic_retry_failure_class{config="my_retries",action="backup",repository="/srv/restic-repo2",class="lock"} 1\n',
+            lines,
+        )
+        self.assertEqual(lines.count("restic_retry_failure_class{"), 1)
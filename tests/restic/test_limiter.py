@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from runrestic.restic.limiter import ConcurrencyLimiter, concurrency_limit
+
+
+@pytest.mark.parametrize(
+    "config, expected",
+    [
+        ({}, 1),
+        ({"parallel": False}, 1),
+        ({"parallel": True}, None),
+        ({"parallel": True, "max_concurrency": 3}, 3),
+        ({"parallel": False, "max_concurrency": 2}, 2),
+    ],
+)
+def test_concurrency_limit(config, expected):
+    assert concurrency_limit(config) == expected
+
+
+def test_limiter_grants_in_request_order():
+    limiter = ConcurrencyLimiter(1)
+    slots = [limiter.request() for _ in range(3)]
+    assert [s.granted for s in slots] == [True, False, False]
+    slots[0].release()
+    assert [s.granted for s in slots] == [False, True, False]
+    slots[1].release()
+    slots[2].release()
+    assert limiter.active == 0
+
+
+def test_limiter_request_limit_and_withdraw():
+    limiter = ConcurrencyLimiter(3)
+    first = limiter.request(limit=1)
+    second = limiter.request(limit=1)
+    unlimited = limiter.request()
+    assert (first.granted, second.granted, unlimited.granted) == (True, False, True)
+    # withdrawing a queued request does not change the active count
+    second.release()
+    second.release()
+    assert limiter.active == 2
+
+
+def test_limiter_bounds_threads():
+    limiter = ConcurrencyLimiter(2)
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with limiter.slot():
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+    assert limiter.active == 0
+
+
+def test_limiter_async_slot():
+    limiter = ConcurrencyLimiter(1)
+    order: list[int] = []
+
+    async def work(i: int) -> None:
+        async with limiter.async_slot():
+            order.append(i)
+            await asyncio.sleep(0.01)
+            assert limiter.active == 1
+
+    async def main() -> None:
+        await asyncio.gather(*(work(i) for i in range(3)))
+
+    asyncio.run(main())
+    assert order == [0, 1, 2]
+    assert limiter.active == 0
+
+
+def test_limiter_async_cancel_releases_queue():
+    limiter = ConcurrencyLimiter(1)
+    held = limiter.request()
+
+    async def main() -> None:
+        waiting = limiter.request()
+        task = asyncio.create_task(waiting.wait_async())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not waiting.granted
+
+    asyncio.run(main())
+    held.release()
+    assert limiter.active == 0
+
+
+def test_limiter_group_limits():
+    limiter = ConcurrencyLimiter(
+        max_concurrency=3, group_limits={"sftp:backup01": 1, "default": 2}
+    )
+    sftp = [limiter.request(group="sftp:backup01") for _ in range(2)]
+    local = [limiter.request(group="local") for _ in range(2)]
+    # the second sftp request waits for its group but does not block the local ones
+    assert [s.granted for s in sftp] == [True, False]
+    assert [s.granted for s in local] == [True, True]
+    assert limiter.active_groups == {"sftp:backup01": 1, "local": 2}
+    assert limiter.group_limit("s3:minio") == 2
+    assert limiter.group_limit(None) is None
+    sftp[0].release()
+    assert sftp[1].granted
+    for slot in [*sftp, *local]:
+        slot.release()
+    assert limiter.active == 0
+    assert limiter.active_groups == {"sftp:backup01": 0, "local": 0}
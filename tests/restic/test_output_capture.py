@@ -0,0 +1,53 @@
+from runrestic.restic.output_capture import OutputCapture
+
+
+def test_output_capture_unbounded():
+    capture = OutputCapture(max_bytes=None)
+    lines = [f"unchanged /file/{i}\n" for i in range(1000)]
+    for line in lines:
+        capture.append(line)
+    assert capture.getvalue() == "".join(lines)
+    assert capture.truncated_bytes == 0
+
+
+def test_output_capture_below_limit():
+    capture = OutputCapture(max_bytes=1000)
+    capture.append("using parent snapshot b601066b\n")
+    capture.append("snapshot 1e3c30a1 saved\n")
+    assert (
+        capture.getvalue()
+        == "using parent snapshot b601066b\nsnapshot 1e3c30a1 saved\n"
+    )
+    assert len(capture) == 55
+
+
+def test_output_capture_keeps_summary_and_tail():
+    capture = OutputCapture(max_bytes=480)
+    capture.append("Files:           5 new,    42 changed,  1842 unmodified\n")
+    capture.append("error: load <snapshot/1234>: file does not exist\n")
+    for i in range(10_000):
+        capture.append(f"unchanged /file/{i:05}\n")
+    capture.append("processed 1888 files, 11.342 GiB in 0:00\n")
+
+    value = capture.getvalue()
+    assert len(capture) <= 480
+    assert value.startswith(
+        "Files:           5 new,    42 changed,  1842 unmodified\n"
+        "error: load <snapshot/1234>: file does not exist\n"
+        "[runrestic: "
+    )
+    assert "unchanged /file/00000" not in value
+    assert "unchanged /file/09999\n" in value
+    assert value.endswith("processed 1888 files, 11.342 GiB in 0:00\n")
+    assert (
+        capture.truncated_bytes + len(capture)
+        == sum(len(f"unchanged /file/{i:05}\n") for i in range(10_000)) + 56 + 49 + 41
+    )
+
+
+def test_output_capture_bounded_summary():
+    capture = OutputCapture(max_bytes=100)
+    for i in range(100):
+        capture.append(f"warning: cannot read /file/{i}\n")
+    assert len(capture) <= 100
+    assert capture.getvalue().rstrip().endswith("warning: cannot read /file/99")
@@ -0,0 +1,70 @@
+import gzip
+import os
+from unittest.mock import patch
+
+from runrestic.restic.process_logs import (
+    log_name,
+    open_log_file,
+    process_log_file,
+    prune_log_files,
+)
+
+
+def test_log_name():
+    assert (
+        log_name("my config", "sftp:user@host:/srv/restic", "backup")
+        == "my_config/sftp_user_host_srv_restic/backup"
+    )
+    assert log_name("", "/", "check") == "_/_/check"
+
+
+def test_open_log_file_gzip(tmp_path):
+    stream, path = open_log_file(str(tmp_path), "cfg/repo/backup", 2)
+    with stream:
+        stream.write("line 1\nline 2\n")
+    assert path.startswith(str(tmp_path / "cfg" / "repo" / "backup"))
+    assert path.endswith("-try2.log.gz")
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        assert file.read() == "line 1\nline 2\n"
+
+
+def test_open_log_file_zstd_fallback(tmp_path, caplog):
+    with patch("runrestic.restic.process_logs._open_zstd", return_value=None):
+        stream, path = open_log_file(str(tmp_path), "cfg", 1, compression="zstd")
+    stream.close()
+    assert path.endswith(".log.gz")
+    assert "No zstd module available" in caplog.text
+
+
+def test_prune_log_files(tmp_path):
+    for i in range(5):
+        path = tmp_path / "cfg" / f"{i}.log.gz"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 + i, 1000 + i))
+    prune_log_files(str(tmp_path), 250)
+    assert sorted(os.listdir(tmp_path / "cfg")) == ["3.log.gz", "4.log.gz"]
+
+
+def test_process_log_file_disabled(tmp_path):
+    with process_log_file({}, "cfg/repo/backup", 1) as (stream, path):
+        assert (stream, path) == (None, None)
+    with process_log_file({"log_dir": str(tmp_path)}, None, 1) as (stream, path):
+        assert (stream, path) == (None, None)
+
+
+def test_process_log_file_retention(tmp_path):
+    config = {"log_dir": str(tmp_path), "log_retention_bytes": 1}
+    with process_log_file(config, "cfg/repo/backup", 1) as (stream, path):
+        stream.write("some output\n")  # type: ignore[union-attr]
+    assert path is not None
+    assert not os.path.exists(path)
+
+
+def test_open_log_file_zstd(tmp_path):
+    stream, path = open_log_file(str(tmp_path), "cfg", 1, compression="zstd")
+    with stream:
+        stream.write("output\n")
+    # depending on the Python version and installed packages
+    assert path.endswith((".log.zst", ".log.gz"))
+    assert os.path.getsize(path) > 0
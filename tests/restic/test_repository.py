@@ -0,0 +1,51 @@
+import pytest
+
+from runrestic.restic.repository import Repository
+
+
+@pytest.mark.parametrize(
+    "url, backend, host, path, group",
+    [
+        ("/srv/restic-repo", "local", None, "/srv/restic-repo", "local"),
+        ("local:/mnt/usb", "local", None, "/mnt/usb", "local"),
+        ("C:\\restic", "local", None, "C:\\restic", "local"),
+        (
+            "sftp:user@Backup01:/srv/restic",
+            "sftp",
+            "backup01",
+            "/srv/restic",
+            "sftp:backup01",
+        ),
+        ("sftp:backup01:restic", "sftp", "backup01", "restic", "sftp:backup01"),
+        (
+            "sftp://user@backup01:2222//srv/restic",
+            "sftp",
+            "backup01",
+            "//srv/restic",
+            "sftp:backup01",
+        ),
+        (
+            "rest:https://user:pw@rest.example.org:8000/repo",
+            "rest",
+            "rest.example.org",
+            "/repo",
+            "rest:rest.example.org",
+        ),
+        (
+            "s3:s3.amazonaws.com/bucket_name",
+            "s3",
+            "s3.amazonaws.com",
+            "bucket_name",
+            "s3:s3.amazonaws.com",
+        ),
+        ("s3:http://user:pw@minio:9000/bucket", "s3", "minio", "/bucket", "s3:minio"),
+        ("b2:bucket:path/to/repo", "b2", None, "bucket:path/to/repo", "b2"),
+        ("azure:container:/repo", "azure", None, "container:/repo", "azure"),
+        ("rclone:remote:path/repo", "rclone", "remote", "path/repo", "rclone:remote"),
+        ("ftp://user:pw@server.com", "ftp", "server.com", "", "ftp:server.com"),
+    ],
+)
+def test_repository_parse(url, backend, host, path, group):
+    repo = Repository.parse(url)
+    assert repo == Repository(url, backend, host, path)
+    assert repo.group == group
@@ -2,17 +2,21 @@ import io
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
 from typing import Any
 from unittest.mock import MagicMock, call, patch
 
 import pytest
 
+from runrestic.restic.limiter import ConcurrencyLimiter
 from runrestic.restic.tools import (
+    AbortMatcher,
     MultiCommand,
     initialize_environment,
     redact_password,
     retry_process,
+    terminate_process,
 )
 
 
@@ -20,6 +24,7 @@ def fake_retry_process(
     cmd: str | list[str],
     config: dict[str, Any],
     abort_reasons: list[str] | None = None,
+    log_name: str | None = None,
 ) -> dict[str, Any]:
     """Fake retry_process function to simulate command execution."""
     # Simulate different outputs per command
@@ -148,9 +153,9 @@ def test_retry_process(
 @pytest.mark.parametrize(
     "backoff, expected_sleep_args",
     [
-        ("0:01", [1, 1, 1]),
-        ("0:01 linear", [1, 2, 3]),
-        ("0:01 exponential", [1, 2, 4]),
+        ("0:01", [1, 1]),
+        ("0:01 linear", [1, 2]),
+        ("0:01 exponential", [1, 2]),
     ],
 )
 @patch("runrestic.restic.tools.time.sleep")
@@ -170,14 +175,29 @@ def test_retry_process_backoff(
         {"retry_count": 2, "retry_backoff": backoff},
     )
 
-    # Assert sleeps
+    # Assert sleeps, there is no backoff after the last try
     expected_calls = [call(arg) for arg in expected_sleep_args]
-    mock_sleep.assert_has_calls(expected_calls)
+    assert mock_sleep.call_args_list == expected_calls
 
     # Remove timing and output details for comparison
     p.pop("time")
     p.pop("output")
-    assert p == {"current_try": 3, "tries_total": 3}
+    assert p == {
+        "current_try": 3,
+        "tries_total": 3,
+        "failure_class": "other",
+        "retry_sleep_seconds": sum(expected_sleep_args),
+    }
+
+
+@patch("runrestic.restic.tools.time.sleep")
+@patch("runrestic.restic.tools.Popen")
+def test_retry_process_fatal_not_retried(mock_popen: MagicMock, mock_sleep: MagicMock):
+    mock_popen.return_value = fake_process(1, "Fatal: wrong password or no key found")
+    p = retry_process(["dummy_command"], {"retry_count": 3, "retry_backoff": "0:01"})
+    assert p["current_try"] == 1
+    assert p["failure_class"] == "fatal"
+    mock_sleep.assert_not_called()
 
 
 @patch("runrestic.restic.tools.Popen")
@@ -220,6 +240,64 @@ def test_run_multiple_commands_serial() -> None:
         assert [x[0] for x in cmd_ret["output"]] == exp
 
 
+@patch("runrestic.restic.tools.retry_process", new=fake_retry_process)
+def test_run_multiple_commands_max_concurrency() -> None:
+    cmds = ["dummy_cmd2", "dummy_cmd2", "dummy_cmd2", "dummy_cmd2"]
+    config = {"retry_count": 2, "parallel": True, "max_concurrency": 2}
+    start_time = time.time()
+    MultiCommand(cmds, config).run()
+    assert 0.6 > time.time() - start_time > 0.35
+
+
+@patch("runrestic.restic.tools.retry_process", new=fake_retry_process)
+def test_run_multiple_commands_shared_limiter() -> None:
+    limiter = ConcurrencyLimiter(1)
+    config = {"retry_count": 2, "parallel": True}
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        runs = [
+            executor.submit(
+                MultiCommand(["dummy_cmd2"] * 2, config, limiter=limiter).run
+            )
+            for _ in range(2)
+        ]
+        for run in runs:
+            run.result()
+    assert time.time() - start_time > 0.75
+    assert limiter.active == 0
+
+
+def test_abort_matcher(caplog):
+    on_match = MagicMock()
+    matcher = AbortMatcher(
+        ["Fatal: wrong password", "Fatal: unable to open config file"], on_match
+    )
+    matcher.feed("repository 1234 opened")
+    assert not matcher.should_abort("restic")
+    matcher.feed("Fatal: unable to open config file: Stat: ...")
+    matcher.feed("Fatal: wrong password (Fatal: unable to open config file)")
+    assert matcher.found == [
+        "Fatal: wrong password",
+        "Fatal: unable to open config file",
+    ]
+    on_match.assert_called_once_with()
+    assert matcher.should_abort("restic")
+    assert "Aborting 'restic' because of" in caplog.text
+
+
+def test_abort_matcher_without_reasons():
+    matcher = AbortMatcher(None)
+    matcher.feed("Fatal: wrong password")
+    assert matcher.found == []
+
+
+def test_terminate_process_exited():
+    process = MagicMock()
+    process.terminate.side_effect = ProcessLookupError
+    terminate_process(process)
+    process.terminate.assert_called_once_with()
+
+
 def test_initialize_environment_pw_redact(caplog):
     env = {"RESTIC_PASSWORD": "my$ecr3T"}
     caplog.set_level(logging.DEBUG)
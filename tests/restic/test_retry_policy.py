@@ -0,0 +1,103 @@
+from unittest.mock import patch
+
+import pytest
+
+from runrestic.restic.retry_policy import RetryPolicy, classify_failure, strategy_delay
+
+
+@pytest.mark.parametrize(
+    "output, expected",
+    [
+        (
+            "unable to create lock in backend: repository is already locked by PID 1",
+            "lock",
+        ),
+        (
+            "Save(<data/1234>) returned error, retrying after 1s: 429 Too Many Requests",
+            "rate_limit",
+        ),
+        ("We encountered an internal error, SlowDown", "rate_limit"),
+        (
+            "Fatal: unable to open repository at sftp:host:/srv: dial tcp: i/o timeout",
+            "network",
+        ),
+        ("ssh: connect to host backup01 port 22: Connection refused", "network"),
+        ("Fatal: wrong password or no key found", "fatal"),
+        (
+            "Fatal: unable to open config file: Stat: stat /srv/restic/config: no such file",
+            "fatal",
+        ),
+        ("unknown flag: --keep-lasst", "fatal"),
+        ("Fatal: something went wrong", "other"),
+    ],
+)
+def test_classify_failure(output, expected):
+    assert classify_failure(output) == expected
+
+
+@pytest.mark.parametrize(
+    "strategy, expected",
+    [("", [10, 10, 10]), ("linear", [10, 20, 30]), ("exponential", [10, 20, 40])],
+)
+def test_strategy_delay(strategy, expected):
+    assert [strategy_delay(10, strategy, i) for i in range(3)] == expected
+
+
+def test_policy_backoff_per_class():
+    policy = RetryPolicy(
+        {
+            "retry_count": 3,
+            "retry_backoff": "0:10",
+            "retry_policy": {"lock": "0:30 linear", "network": "never"},
+        }
+    )
+    assert policy.next_delay(0, "lock", "restic") == 30
+    assert policy.next_delay(1, "lock", "restic") == 60
+    assert policy.next_delay(1, "other", "restic") == 10
+    assert policy.next_delay(1, "network", "restic") is None
+    # fatal failures are not retried unless configured
+    assert policy.next_delay(1, "fatal", "restic") is None
+    # no retry after the last try
+    assert policy.next_delay(3, "other", "restic") is None
+    assert policy.slept == 100
+
+
+def test_policy_without_backoff():
+    policy = RetryPolicy({"retry_count": 1})
+    assert policy.next_delay(0, "other", "restic") == 0
+    assert policy.slept == 0
+
+
+def test_policy_jitter_and_max_delay():
+    policy = RetryPolicy(
+        {
+            "retry_count": 20,
+            "retry_backoff": "0:10 exponential",
+            "retry_jitter": True,
+            "retry_max_delay": "2:00",
+        }
+    )
+    delays = [policy.next_delay(i, "network", "restic") for i in range(10)]
+    assert all(d is not None and 10 <= d <= 120 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_policy_jitter_decorrelated():
+    policy = RetryPolicy(
+        {"retry_count": 5, "retry_backoff": "0:10", "retry_jitter": True}
+    )
+    with patch("runrestic.restic.retry_policy.random.uniform", side_effect=max):
+        # the upper bound grows with the previous delay, capped at three times the strategy delay
+        assert policy.next_delay(0, "other", "restic") == 30
+        assert policy.next_delay(1, "other", "restic") == 30
+
+
+def test_policy_deadline(caplog):
+    with patch("runrestic.restic.retry_policy.time.monotonic", return_value=0):
+        policy = RetryPolicy(
+            {"retry_count": 5, "retry_backoff": "1:00", "retry_deadline": "2:30"}
+        )
+        assert policy.next_delay(0, "other", "restic") == 60
+    with patch("runrestic.restic.retry_policy.time.monotonic", return_value=100):
+        assert policy.next_delay(1, "other", "restic") is None
+    assert "retry deadline of 150 sec reached" in caplog.text
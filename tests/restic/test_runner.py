@@ -28,6 +28,71 @@ class TestResticRunner(TestCase):
         self.assertTrue(runner_instance.log_metrics)
         self.assertEqual(runner_instance.pw_replacement, "dummy_pw")
 
+    @patch("runrestic.restic.runner.initialize_environment")
+    def test_execution_config_action_override(self, mock_init_env):
+        """
+        Test that action sub-tables override the general execution settings.
+        """
+        config = {
+            "repositories": ["repo"],
+            "environment": {},
+            "execution": {
+                "parallel": True,
+                "max_concurrency": 4,
+                "retry_count": 2,
+                "check": {"max_concurrency": 1},
+            },
+        }
+        runner_instance = runner.ResticRunner(config, Namespace(dry_run=False), [])
+        self.assertEqual(runner_instance.limiter.max_concurrency, 4)
+        self.assertEqual(runner_instance.repo_groups(), ["local"])
+        self.assertEqual(runner_instance.log_names("check"), ["_/repo/check"])
+        self.assertEqual(
+            runner_instance.execution_config("check"),
+            {"parallel": True, "max_concurrency": 1, "retry_count": 2},
+        )
+        self.assertEqual(
+            runner_instance.execution_config("backup"),
+            {"parallel": True, "max_concurrency": 4, "retry_count": 2},
+        )
+
+    @patch("runrestic.restic.runner.initialize_environment")
+    def test_record_retries(self, mock_init_env):
+        """
+        Test that the retry details of the repository commands are stored in the metrics.
+        """
+        config = {
+            "repositories": ["repo1", "repo2"],
+            "environment": {},
+            "execution": {},
+        }
+        runner_instance = runner.ResticRunner(config, Namespace(dry_run=False), [])
+        runner_instance.record_retries(
+            "check",
+            [
+                {"output": [(0, "")], "current_try": 1},
+                {
+                    "output": [(1, ""), (1, "")],
+                    "current_try": 2,
+                    "retry_sleep_seconds": 30.0,
+                    "failure_class": "network",
+                },
+            ],
+        )
+        self.assertEqual(
+            runner_instance.metrics["retries"],
+            {
+                "check": {
+                    "repo1": {"tries": 1, "sleep_seconds": 0.0, "failure_class": None},
+                    "repo2": {
+                        "tries": 2,
+                        "sleep_seconds": 30.0,
+                        "failure_class": "network",
+                    },
+                }
+            },
+        )
+
     @patch.object(runner.ResticRunner, "init")
     @patch.object(runner.ResticRunner, "backup")
     @patch.object(runner.ResticRunner, "forget")
@@ -306,7 +371,12 @@ class TestResticRunner(TestCase):
             "Fatal: wrong password",
         ]
         mock_mc.assert_called_once_with(
-            expected_commands, config["execution"], expected_abort
+            expected_commands,
+            config["execution"],
+            expected_abort,
+            limiter=runner_instance.limiter,
+            groups=runner_instance.repo_groups(),
+            log_names=runner_instance.log_names("backup"),
         )
         mock_mc.return_value.run.assert_called_once()
 
@@ -328,6 +398,7 @@ class TestResticRunner(TestCase):
         """
         # Arrange
         config: dict[str, Any] = {
+            "name": "test",
             "repositories": ["repo"],
             "environment": {},
             "execution": {"foo": "bar"},
@@ -368,7 +439,10 @@ class TestResticRunner(TestCase):
         calls = mock_mc.call_args_list
         # 1) pre_hooks
         self.assertEqual(calls[0][0][0], config["backup"]["pre_hooks"])
-        self.assertEqual(calls[0][1], {"config": hooks_cfg})
+        self.assertEqual(
+            calls[0][1],
+            {"config": hooks_cfg, "log_names": ["test/hooks/pre_hooks"] * 2},
+        )
         # 2) main backup
         expected_cmds = [
             [
@@ -386,7 +460,10 @@ class TestResticRunner(TestCase):
         self.assertEqual(calls[1][0][2], expected_abort)
         # 3) post_hooks
         self.assertEqual(calls[2][0][0], config["backup"]["post_hooks"])
-        self.assertEqual(calls[2][1], {"config": hooks_cfg})
+        self.assertEqual(
+            calls[2][1],
+            {"config": hooks_cfg, "log_names": ["test/hooks/post_hooks"] * 2},
+        )
 
         # Assert metrics
         m = runner_instance.metrics["backup"]
@@ -438,6 +515,9 @@ class TestResticRunner(TestCase):
                 "Fatal: unable to open config file",
                 "Fatal: wrong password",
             ],
+            limiter=runner_instance.limiter,
+            groups=runner_instance.repo_groups(),
+            log_names=runner_instance.log_names("unlock"),
         )
         mock_mc.return_value.run.assert_called_once()
 
@@ -525,6 +605,9 @@ class TestResticRunner(TestCase):
                 "Fatal: unable to open config file",
                 "Fatal: wrong password",
             ],
+            limiter=runner_instance.limiter,
+            groups=runner_instance.repo_groups(),
+            log_names=runner_instance.log_names("forget"),
         )
 
     @patch("runrestic.restic.runner.MultiCommand")
@@ -578,6 +661,9 @@ class TestResticRunner(TestCase):
                 "Fatal: unable to open config file",
                 "Fatal: wrong password",
             ],
+            limiter=runner_instance.limiter,
+            groups=runner_instance.repo_groups(),
+            log_names=runner_instance.log_names("forget"),
         )
 
     @patch("runrestic.restic.runner.MultiCommand")
@@ -628,6 +714,9 @@ class TestResticRunner(TestCase):
                 "Fatal: unable to open config file",
                 "Fatal: wrong password",
             ],
+            limiter=runner_instance.limiter,
+            groups=runner_instance.repo_groups(),
+            log_names=runner_instance.log_names("forget"),
         )
 
     @patch("runrestic.restic.runner.MultiCommand")
@@ -872,6 +961,9 @@ class TestResticRunner(TestCase):
                     expected_commands,
                     config=sc["config"]["execution"],
                     abort_reasons=expected_abort,
+                    limiter=runner_instance.limiter,
+                    groups=runner_instance.repo_groups(),
+                    log_names=runner_instance.log_names("check"),
                 )
                 mock_mc.return_value.run.assert_called_once()
 
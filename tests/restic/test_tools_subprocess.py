@@ -3,7 +3,10 @@
 Using pytest-subprocess plugin https://pytest-subprocess.readthedocs.io/
 """
 
+import asyncio
+import gzip
 import logging
+import signal
 import subprocess
 from io import StringIO
 
@@ -98,7 +101,7 @@ def test_retry_pass_logs(caplog, fp, monkeypatch):  # pylint: disable=invalid-na
         "[restic] Fatal: something went wrong",
     ) in caplog.record_tuples
     assert (
-        "runrestic.restic.tools",
+        "runrestic.restic.retry_policy",
         logging.INFO,
         f"Retry {retries}/{retries + 1} command 'restic'",
     ) in caplog.record_tuples
@@ -125,7 +128,7 @@ def test_retry_fail_logs(caplog, fp, monkeypatch):  # pylint: disable=invalid-na
         "[restic] Fatal: something went wrong",
     ) in caplog.record_tuples
     assert (
-        "runrestic.restic.tools",
+        "runrestic.restic.retry_policy",
         logging.INFO,
         f"Retry 2/{retries + 1} command 'restic'",
     ) in caplog.record_tuples
@@ -185,3 +188,101 @@ def test_hook_log(caplog, fp, monkeypatch):  # pylint: disable=invalid-name
             level,
             f"[{cmd.split(' ', maxsplit=1)[0]}] {message}",
         ) in caplog.record_tuples
+
+
+def test_async_restic_logs(caplog, fp):  # pylint: disable=invalid-name
+    cmd = ["restic", "-r", "test_repo", "backup"]
+    out = [
+        "using parent snapshot b601066b",
+        "unchanged /some/file",
+        "snapshot 1e3c30a1 saved",
+    ]
+    fp.register(cmd, stdout=out, returncode=0)
+    caplog.set_level(logging.DEBUG)
+    result = asyncio.run(tools.async_retry_process(cmd, config={}))
+    assert result["output"] == [(0, "\n".join([*out, ""]))]
+    assert result["current_try"] == 1
+    assert (
+        "runrestic.restic.tools",
+        logging.DEBUG,
+        "[restic] unchanged /some/file",
+    ) in caplog.record_tuples
+
+
+def test_async_restic_abort(caplog, fp):  # pylint: disable=invalid-name
+    cmd = ["restic", "-r", "test_repo", "backup"]
+    out = ["Fatal: wrong password"]
+    fp.register(cmd, stdout=out, returncode=1, occurrences=3)
+    caplog.set_level(logging.INFO)
+    result = asyncio.run(
+        tools.async_retry_process(
+            cmd, config={"retry_count": 2}, abort_reasons=["Fatal: wrong password"]
+        )
+    )
+    assert result["output"] == [(1, "Fatal: wrong password\n")]
+    assert (
+        "runrestic.restic.tools",
+        logging.ERROR,
+        "Aborting 'restic' because of ['Fatal: wrong password']",
+    ) in caplog.record_tuples
+
+
+def test_async_retry_pass(fp):  # pylint: disable=invalid-name
+    cmd = "hook_cmd --some-option"
+    fp.register(cmd, stdout=["fail"], returncode=1, occurrences=2)
+    fp.register(cmd, stdout=["pass"], returncode=0)
+    result = asyncio.run(
+        tools.async_retry_process(cmd, config={"retry_count": 2, "shell": True})
+    )
+    assert result["output"] == [(1, "fail\n"), (1, "fail\n"), (0, "pass\n")]
+    assert result["current_try"] == 3
+
+
+def test_multi_command_asyncio_engine(fp):  # pylint: disable=invalid-name
+    cmds = [["restic", "-r", f"repo{i}", "check"] for i in range(3)]
+    for i, cmd in enumerate(cmds):
+        fp.register(cmd, stdout=[f"checked {i}"], returncode=i % 2)
+    result = tools.MultiCommand(
+        cmds, config={"parallel": True, "engine": "asyncio"}
+    ).run()
+    assert [r["output"] for r in result] == [
+        [(0, "checked 0\n")],
+        [(1, "checked 1\n")],
+        [(0, "checked 2\n")],
+    ]
+
+
+def test_restic_log_files(fp, monkeypatch, tmp_path):  # pylint: disable=invalid-name
+    cmd = ["restic", "-r", "test_repo", "backup"]
+    out = ["unchanged /a", "", "snapshot 1e3c30a1 saved"]
+    fp.register(cmd, stdout=out, returncode=1)
+    fp.register(cmd, stdout=out, returncode=0)
+    monkeypatch.setattr(tools, "Popen", subprocess.Popen)
+    result = tools.retry_process(
+        cmd,
+        config={"retry_count": 1, "log_dir": str(tmp_path)},
+        log_name="cfg/test_repo/backup",
+    )
+    assert len(result["log_files"]) == 2
+    assert result["log_files"][0].endswith("-try1.log.gz")
+    for log_file in result["log_files"]:
+        with gzip.open(log_file, "rt", encoding="utf-8") as file:
+            assert file.read() == "unchanged /a\n\nsnapshot 1e3c30a1 saved\n"
+
+
+def test_restic_abort_terminates_early(fp, monkeypatch):  # pylint: disable=invalid-name
+    cmd = ["restic", "-r", "test_repo", "backup"]
+    signals = []
+    fp.register(
+        cmd,
+        stdout=["open repository", "Fatal: wrong password", "still running"],
+        returncode=1,
+        signal_callback=lambda process, sig: signals.append(sig),
+    )
+    monkeypatch.setattr(tools, "Popen", subprocess.Popen)
+    result = tools.retry_process(
+        cmd, config={"retry_count": 2}, abort_reasons=["Fatal: wrong password"]
+    )
+    assert signals == [signal.SIGTERM]
+    assert result["current_try"] == 1
+    assert fp.call_count(cmd) == 1